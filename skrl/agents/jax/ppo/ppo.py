@@ -2,6 +2,7 @@ from typing import Any, Mapping, Optional, Tuple, Union
 
 import copy
 import functools
+import inspect
 import gym
 import gymnasium
 
@@ -17,11 +18,18 @@ from skrl.resources.optimizers.jax import Adam
 from skrl.resources.schedulers.jax import KLAdaptiveLR
 
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
 # [start-config-dict-jax]
 PPO_DEFAULT_CONFIG = {
     "rollouts": 16,                 # number of rollouts before updating
     "learning_epochs": 8,           # number of learning epochs during each update
     "mini_batches": 2,              # number of mini batches during each learning epoch
+    "vectorized_mini_batches": False,   # compute mini-batches gradients in parallel (vmap) and apply their mean once per epoch
 
     "discount_factor": 0.99,        # discount factor (gamma)
     "lambda": 0.95,                 # TD(lambda) coefficient (lam) for computing returns and advantages
@@ -51,6 +59,8 @@ PPO_DEFAULT_CONFIG = {
     "rewards_shaper": None,         # rewards shaping function: Callable(reward, timestep, timesteps) -> reward
     "time_limit_bootstrap": False,  # bootstrap at timeout termination (episode truncation)
 
+    "bfloat16_storage": False,      # store values, returns and advantages in memory as bfloat16 (JAX backend only)
+
     "experiment": {
         "directory": "",            # experiment's parent directory
         "experiment_name": "",      # experiment name
@@ -66,6 +76,23 @@ PPO_DEFAULT_CONFIG = {
 # [end-config-dict-jax]
 
 
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True)
+    def _compute_gae_numba(rewards, dones, values, next_values, discount_factor, lambda_coefficient):
+        # advantages computation (reverse-time loop over the flattened environments)
+        memory_size, num_envs = rewards.shape
+        advantages = np.empty_like(rewards)
+        advantage = np.zeros(num_envs, dtype=np.float64)
+        next_value = next_values
+        for i in range(memory_size - 1, -1, -1):
+            for j in range(num_envs):
+                not_done = 0.0 if dones[i, j] else 1.0
+                advantage[j] = rewards[i, j] - values[i, j] \
+                    + discount_factor * not_done * (next_value[j] + lambda_coefficient * advantage[j])
+                advantages[i, j] = advantage[j]
+            next_value = values[i]
+        return advantages
+
 def compute_gae(rewards: np.ndarray,
                 dones: np.ndarray,
                 values: np.ndarray,
@@ -90,16 +117,39 @@ def compute_gae(rewards: np.ndarray,
     :return: Generalized Advantage Estimator
     :rtype: np.ndarray
     """
+    # compiled (Numba) advantages computation, if available
+    if numba is not None:
+        def _flatten(x, shape, dtype):
+            return np.ascontiguousarray(np.broadcast_to(x, shape), dtype=dtype).reshape(shape[0], -1)
+
+        # broadcast the inputs to C-contiguous (memory size, flattened environments) arrays with a common dtype
+        shape = np.broadcast_shapes(np.shape(rewards), np.shape(values))
+        dtype = np.result_type(rewards, values)
+        advantages = _compute_gae_numba(_flatten(rewards, shape, dtype),
+                                        _flatten(dones, shape, None),
+                                        _flatten(values, shape, dtype),
+                                        _flatten(next_values, (1, *shape[1:]), dtype)[0],
+                                        discount_factor,
+                                        lambda_coefficient).reshape(shape).astype(np.result_type(rewards), copy=False)
+        # returns computation
+        returns = advantages + values
+        # normalize advantages
+        advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+
+        return returns, advantages
+
     advantage = 0
     advantages = np.zeros_like(rewards)
-    not_dones = np.logical_not(dones)
+    # discount factor masked by the episode ends (computed once for the whole memory)
+    discounts = discount_factor * np.logical_not(dones)
     memory_size = rewards.shape[0]
 
     # advantages computation
     for i in reversed(range(memory_size)):
-        next_values = values[i + 1] if i < memory_size - 1 else next_values
-        advantage = rewards[i] - values[i] + discount_factor * not_dones[i] * (next_values + lambda_coefficient * advantage)
+        value = values[i]
+        advantage = rewards[i] - value + discounts[i] * (next_values + lambda_coefficient * advantage)
         advantages[i] = advantage
+        next_values = value
     # returns computation
     returns = advantages + values
     # normalize advantages
@@ -107,6 +157,10 @@ def compute_gae(rewards: np.ndarray,
 
     return returns, advantages
 
+# number of GAE scan iterations unrolled per loop step (only for short rollouts, to limit the compilation time)
+_GAE_SCAN_UNROLL = 4
+_GAE_SCAN_UNROLL_MAX_ROLLOUTS = 64
+
 # https://jax.readthedocs.io/en/latest/faq.html#strategy-1-jit-compiled-helper-function
 @jax.jit
 def _compute_gae(rewards: jax.Array,
@@ -115,36 +169,60 @@ def _compute_gae(rewards: jax.Array,
                  next_values: jax.Array,
                  discount_factor: float = 0.99,
                  lambda_coefficient: float = 0.95) -> jax.Array:
-    advantage = 0
-    advantages = jnp.zeros_like(rewards)
-    not_dones = jnp.logical_not(dones)
-    memory_size = rewards.shape[0]
+    # advantages computation (reverse-time scan with carry: advantage, next values, sum and sum of squares)
+    def _step(carry, x):
+        advantage, next_values, advantages_sum, advantages_sum_sq = carry
+        reward, not_done, value = x
+        advantage = reward - value + discount_factor * not_done * (next_values + lambda_coefficient * advantage)
+        return (advantage, value, advantages_sum + advantage.sum(), advantages_sum_sq + jnp.square(advantage).sum()), advantage
 
-    # advantages computation
-    for i in reversed(range(memory_size)):
-        next_values = values[i + 1] if i < memory_size - 1 else next_values
-        advantage = rewards[i] - values[i] + discount_factor * not_dones[i] * (next_values + lambda_coefficient * advantage)
-        advantages = advantages.at[i].set(advantage)
+    not_dones = jnp.logical_not(dones)
+    carry = (jnp.zeros_like(next_values), next_values, jnp.zeros((), next_values.dtype), jnp.zeros((), next_values.dtype))
+    unroll = _GAE_SCAN_UNROLL if rewards.shape[0] <= _GAE_SCAN_UNROLL_MAX_ROLLOUTS else 1
+    (_, _, advantages_sum, advantages_sum_sq), advantages = \
+        jax.lax.scan(_step, carry, (rewards, not_dones, values), reverse=True, unroll=unroll)
     # returns computation
     returns = advantages + values
-    # normalize advantages
-    advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+    # normalize advantages (using the statistics accumulated during the scan)
+    mean = advantages_sum / advantages.size
+    std = jnp.sqrt(jnp.maximum(advantages_sum_sq / advantages.size - jnp.square(mean), 0))
+    advantages = (advantages - mean) / (std + 1e-8)
 
     return returns, advantages
 
-@functools.partial(jax.jit, static_argnames=("policy_act", "get_entropy", "entropy_loss_scale"))
-def _update_policy(policy_act,
-                   policy_state_dict,
-                   sampled_states,
-                   sampled_actions,
-                   sampled_log_prob,
-                   sampled_advantages,
-                   ratio_clip,
-                   get_entropy,
-                   entropy_loss_scale):
-    # compute policy loss
-    def _policy_loss(params):
-        _, next_log_prob, outputs = policy_act({"states": sampled_states, "taken_actions": sampled_actions}, "policy", params)
+# the models' and preprocessors' functions are bound (and the function is jitted) in the agent's init
+def _compute_values(value_act,
+                    state_preprocessor,
+                    value_preprocessor,
+                    value_params,
+                    state_preprocessor_params,
+                    value_preprocessor_params,
+                    states):
+    # preprocess the states, compute the values and scale them back (the preprocessors' statistics are passed explicitly)
+    states = state_preprocessor(states, params=state_preprocessor_params)
+    values, _, _ = value_act({"states": states}, role="value", params=value_params)
+    return value_preprocessor(values, inverse=True, params=value_preprocessor_params)
+
+# traced within the learning epochs and mini-batches loops (_update_epochs)
+def _update_policy_value(policy_act,
+                         value_act,
+                         policy_state_dict,
+                         value_state_dict,
+                         sampled_states,
+                         sampled_actions,
+                         sampled_log_prob,
+                         sampled_values,
+                         sampled_returns,
+                         sampled_advantages,
+                         ratio_clip,
+                         get_entropy,
+                         entropy_loss_scale,
+                         value_loss_scale,
+                         clip_predicted_values,
+                         value_clip):
+    # compute policy and value losses (combined)
+    def _loss(policy_params, value_params):
+        _, next_log_prob, outputs = policy_act({"states": sampled_states, "taken_actions": sampled_actions}, "policy", policy_params)
 
         # compute approximate KL divergence
         ratio = next_log_prob - sampled_log_prob
@@ -154,37 +232,152 @@ def _update_policy(policy_act,
         ratio = jnp.exp(next_log_prob - sampled_log_prob)
         surrogate = sampled_advantages * ratio
         surrogate_clipped = sampled_advantages * jnp.clip(ratio, 1.0 - ratio_clip, 1.0 + ratio_clip)
+        policy_loss = -jnp.minimum(surrogate, surrogate_clipped).mean()
 
         # compute entropy loss
         entropy_loss = 0
         if entropy_loss_scale:
             entropy_loss = -entropy_loss_scale * get_entropy(outputs["stddev"], role="policy").mean()
 
-        return -jnp.minimum(surrogate, surrogate_clipped).mean(), (entropy_loss, kl_divergence, outputs["stddev"])
+        # compute value loss
+        predicted_values, _, _ = value_act({"states": sampled_states}, "value", value_params)
+        if clip_predicted_values:
+            predicted_values = sampled_values + jnp.clip(predicted_values - sampled_values, -value_clip, value_clip)
+        value_loss = value_loss_scale * ((sampled_returns - predicted_values) ** 2).mean()
 
-    (policy_loss, (entropy_loss, kl_divergence, stddev)), grad = jax.value_and_grad(_policy_loss, has_aux=True)(policy_state_dict.params)
+        return policy_loss + entropy_loss + value_loss, (policy_loss, entropy_loss, value_loss, kl_divergence, outputs["stddev"])
 
-    return grad, policy_loss, entropy_loss, kl_divergence, stddev
+    (_, (policy_loss, entropy_loss, value_loss, kl_divergence, stddev)), (policy_grad, value_grad) = \
+        jax.value_and_grad(_loss, argnums=(0, 1), has_aux=True)(policy_state_dict.params, value_state_dict.params)
 
-@functools.partial(jax.jit, static_argnames=("value_act", "clip_predicted_values"))
-def _update_value(value_act,
-                  value_state_dict,
-                  sampled_states,
-                  sampled_values,
-                  sampled_returns,
-                  value_loss_scale,
-                  clip_predicted_values,
-                  value_clip):
-    # compute value loss
-    def _value_loss(params):
-        predicted_values, _, _ = value_act({"states": sampled_states}, "value", params)
-        if clip_predicted_values:
-            predicted_values = sampled_values + jnp.clip(predicted_values - sampled_values, -value_clip, value_clip)
-        return value_loss_scale * ((sampled_returns - predicted_values) ** 2).mean()
+    return policy_grad, value_grad, policy_loss, entropy_loss, value_loss, kl_divergence, stddev
+
+
+# the models' functions and the agent's settings are bound (and the function is jitted) in the agent's init
+def _update_epochs(policy_state_dict,
+                   value_state_dict,
+                   policy_optimizer,
+                   value_optimizer,
+                   learning_rate,
+                   sampled_tensors,
+                   indexes,
+                   ratio_clip,
+                   value_loss_scale,
+                   value_clip,
+                   policy_act,
+                   value_act,
+                   get_entropy,
+                   entropy_loss_scale,
+                   clip_predicted_values,
+                   kl_threshold,
+                   scheduler,
+                   vectorized_mini_batches):
+    # optimization step
+    def _optimization_step(carry, policy_grad, value_grad, step_losses, kl_divergence, next_stddev):
+        policy_state_dict, value_state_dict, policy_optimizer, value_optimizer, learning_rate, \
+            stop, kl_divergences, losses, stddev = carry
+
+        # mini-batches after the one that triggered the early stopping are not evaluated
+        evaluated = jnp.logical_not(stop)
+        kl_divergences = kl_divergences + evaluated * jnp.array([kl_divergence, 1])
+        stddev = jnp.where(evaluated, next_stddev, stddev)
+
+        # early stopping with KL divergence
+        if kl_threshold:
+            stop = jnp.logical_or(stop, kl_divergence > kl_threshold)
+
+        # reduce (collect from all workers/processes) gradients in distributed runs
+        if config.jax.is_distributed:
+            policy_grad, value_grad = jax.tree_util.tree_map(lambda g: jax.lax.psum(g, "i") / config.jax.world_size,
+                                                             (policy_grad, value_grad))
+
+        # optimization steps (policy and value)
+        next_policy_optimizer, next_policy_state_dict = policy_optimizer.apply_gradients(policy_grad, policy_state_dict, learning_rate)
+        next_value_optimizer, next_value_state_dict = value_optimizer.apply_gradients(value_grad, value_state_dict, learning_rate)
+
+        # skip the optimization steps (and the losses) if early stopping was triggered
+        updated = jnp.logical_not(stop)
+        policy_optimizer, policy_state_dict, value_optimizer, value_state_dict = jax.tree_util.tree_map(
+            lambda new, current: jnp.where(updated, new, current),
+            (next_policy_optimizer, next_policy_state_dict, next_value_optimizer, next_value_state_dict),
+            (policy_optimizer, policy_state_dict, value_optimizer, value_state_dict))
+
+        # update cumulative losses
+        losses = losses + updated * step_losses
+
+        return (policy_state_dict, value_state_dict, policy_optimizer, value_optimizer, learning_rate, \
+            stop, kl_divergences, losses, stddev)
+
+    # compute policy and value losses for the mini-batch sampled with the given indexes
+    def _losses(policy_state_dict, value_state_dict, index):
+        sampled_states, sampled_actions, sampled_log_prob, sampled_values, sampled_returns, sampled_advantages = \
+            [tensor[index] for tensor in sampled_tensors]
+        # cast up the tensors that may be stored in memory with reduced precision (bfloat16)
+        sampled_values, sampled_returns, sampled_advantages = \
+            [tensor.astype(jnp.float32) for tensor in (sampled_values, sampled_returns, sampled_advantages)]
+        return _update_policy_value(policy_act,
+                                    value_act,
+                                    policy_state_dict,
+                                    value_state_dict,
+                                    sampled_states,
+                                    sampled_actions,
+                                    sampled_log_prob,
+                                    sampled_values,
+                                    sampled_returns,
+                                    sampled_advantages,
+                                    ratio_clip,
+                                    get_entropy,
+                                    entropy_loss_scale,
+                                    value_loss_scale,
+                                    clip_predicted_values,
+                                    value_clip)
+
+    # mini-batch update step (sequential)
+    def _mini_batch_step(carry, index):
+        policy_grad, value_grad, policy_loss, entropy_loss, value_loss, kl_divergence, stddev = \
+            _losses(carry[0], carry[1], index)
+        step_losses = jnp.array([policy_loss, value_loss, entropy_loss])
+        return _optimization_step(carry, policy_grad, value_grad, step_losses, kl_divergence, stddev.mean()), None
+
+    # mini-batches update step (vectorized).
+    # Gradients are computed for all mini-batches with the same parameters and their mean is applied once.
+    # This is not equivalent to the sequential update, unless there is only one mini-batch
+    def _vectorized_mini_batches_step(carry, indexes):
+        policy_grad, value_grad, policy_loss, entropy_loss, value_loss, kl_divergence, stddev = \
+            jax.vmap(_losses, in_axes=(None, None, 0))(carry[0], carry[1], indexes)
+        policy_grad, value_grad = jax.tree_util.tree_map(lambda g: g.mean(axis=0), (policy_grad, value_grad))
+        step_losses = jnp.array([policy_loss.sum(), value_loss.sum(), jnp.sum(entropy_loss)])
+        return _optimization_step(carry, policy_grad, value_grad, step_losses, kl_divergence.mean(), stddev[-1].mean())
+
+    # learning epoch
+    def _epoch_step(carry, indexes):
+        policy_state_dict, value_state_dict, policy_optimizer, value_optimizer, learning_rate, losses, stddev = carry
+
+        # mini-batches loop
+        carry = (policy_state_dict, value_state_dict, policy_optimizer, value_optimizer, learning_rate, \
+            jnp.array(False), jnp.zeros(2), losses, stddev)
+        if vectorized_mini_batches:
+            carry = _vectorized_mini_batches_step(carry, indexes)
+        else:
+            carry, _ = jax.lax.scan(_mini_batch_step, carry, indexes)
+        policy_state_dict, value_state_dict, policy_optimizer, value_optimizer, learning_rate, \
+            _, kl_divergences, losses, stddev = carry
+
+        # update learning rate
+        if isinstance(scheduler, KLAdaptiveLR):
+            kl = kl_divergences[0] / kl_divergences[1]
+            # reduce (collect from all workers/processes) KL in distributed runs
+            if config.jax.is_distributed:
+                kl = jax.lax.psum(kl, "i") / config.jax.world_size
+            learning_rate = scheduler.compute_lr(learning_rate, kl)
 
-    value_loss, grad = jax.value_and_grad(_value_loss, has_aux=False)(value_state_dict.params)
+        return (policy_state_dict, value_state_dict, policy_optimizer, value_optimizer, learning_rate, losses, stddev), None
 
-    return grad, value_loss
+    # learning epochs loop
+    carry = (policy_state_dict, value_state_dict, policy_optimizer, value_optimizer, learning_rate, jnp.zeros(3), jnp.zeros(()))
+    carry, _ = jax.lax.scan(_epoch_step, carry, indexes)
+
+    return carry
 
 
 class PPO(Agent):
@@ -246,6 +439,7 @@ class PPO(Agent):
         # configuration
         self._learning_epochs = self.cfg["learning_epochs"]
         self._mini_batches = self.cfg["mini_batches"]
+        self._vectorized_mini_batches = self.cfg["vectorized_mini_batches"]
         self._rollouts = self.cfg["rollouts"]
         self._rollout = 0
 
@@ -274,6 +468,8 @@ class PPO(Agent):
         self._rewards_shaper = self.cfg["rewards_shaper"]
         self._time_limit_bootstrap = self.cfg["time_limit_bootstrap"]
 
+        self._bfloat16_storage = self.cfg["bfloat16_storage"] and self._jax
+
         # set up optimizer and learning rate scheduler
         if self.policy is not None and self.value is not None:
             # scheduler
@@ -318,23 +514,102 @@ class PPO(Agent):
             self.memory.create_tensor(name="actions", size=self.action_space, dtype=jnp.float32)
             self.memory.create_tensor(name="rewards", size=1, dtype=jnp.float32)
             self.memory.create_tensor(name="terminated", size=1, dtype=jnp.int8)
+            # log probabilities are kept in single precision since the ratio (exponential of their difference) is sensitive to rounding
             self.memory.create_tensor(name="log_prob", size=1, dtype=jnp.float32)
-            self.memory.create_tensor(name="values", size=1, dtype=jnp.float32)
-            self.memory.create_tensor(name="returns", size=1, dtype=jnp.float32)
-            self.memory.create_tensor(name="advantages", size=1, dtype=jnp.float32)
+            storage_dtype = jnp.bfloat16 if self._bfloat16_storage else jnp.float32
+            self.memory.create_tensor(name="values", size=1, dtype=storage_dtype)
+            self.memory.create_tensor(name="returns", size=1, dtype=storage_dtype)
+            self.memory.create_tensor(name="advantages", size=1, dtype=storage_dtype)
 
             # tensors sampled during training
             self._tensors_names = ["states", "actions", "log_prob", "values", "returns", "advantages"]
 
         # create temporary variables needed for storage and computation
         self._current_log_prob = None
+        self._current_values = None
         self._current_next_states = None
 
         # set up models for just-in-time compilation with XLA
+        # (the role is a static argument, resolved once at trace time inside the jitted values computation and update)
         self.policy.apply = jax.jit(self.policy.apply, static_argnums=2)
         if self.value is not None:
             self.value.apply = jax.jit(self.value.apply, static_argnums=2)
 
+        # set up the values computation (preprocessing and value forward) for just-in-time compilation with XLA.
+        # The preprocessors' statistics must be passed explicitly, otherwise they would be frozen at trace time
+        self._compute_values = None
+        if self.value is not None:
+            if all(self._preprocessor_supports(preprocessor, "params") and (preprocessor == self._empty_preprocessor \
+                    or hasattr(preprocessor, "state_dict")) for preprocessor in (self._state_preprocessor, self._value_preprocessor)):
+                self._compute_values = jax.jit(functools.partial(_compute_values,
+                                                                 value_act=self.value.act,
+                                                                 state_preprocessor=self._state_preprocessor,
+                                                                 value_preprocessor=self._value_preprocessor))
+            else:
+                logger.warning("The preprocessors don't support computing their output with given statistics "
+                               "(state_dict.params). Values will be computed without just-in-time compilation")
+
+        # set up the update step (learning epochs and mini-batches loops) for just-in-time compilation with XLA
+        if self.policy is not None and self.value is not None:
+            self._update_epochs = functools.partial(_update_epochs,
+                                                    policy_act=self.policy.act,
+                                                    value_act=self.value.act,
+                                                    get_entropy=self.policy.get_entropy,
+                                                    entropy_loss_scale=self._entropy_loss_scale,
+                                                    clip_predicted_values=self._clip_predicted_values,
+                                                    kl_threshold=self._kl_threshold,
+                                                    scheduler=self.scheduler,
+                                                    vectorized_mini_batches=self._vectorized_mini_batches)
+            # parallelize it to perform collective operations (all-reduce) in distributed runs.
+            # The models and optimizers buffers are donated
+            if config.jax.is_distributed:
+                self._update_epochs = jax.pmap(self._update_epochs, axis_name="i", donate_argnums=(0, 1, 2, 3))
+            else:
+                self._update_epochs = jax.jit(self._update_epochs, donate_argnums=(0, 1, 2, 3))
+
+    def _preprocessor_supports(self, preprocessor: Any, argument: str) -> bool:
+        """Check whether a preprocessor supports an optional argument (e.g.: ``params`` or ``donate``)
+
+        :param preprocessor: State or value preprocessor
+        :type preprocessor: Any
+        :param argument: Argument name
+        :type argument: str
+
+        :return: Whether the preprocessor is the empty preprocessor or it supports the argument
+        :rtype: bool
+        """
+        if preprocessor == self._empty_preprocessor:
+            return True
+        return argument in inspect.signature(preprocessor).parameters
+
+    def _preprocessor_params(self, preprocessor: Any) -> Union[Mapping[str, Union[np.ndarray, jax.Array]], None]:
+        """Get the running statistics of a preprocessor (``None`` for the empty preprocessor)
+
+        :param preprocessor: State or value preprocessor
+        :type preprocessor: Any
+
+        :return: Preprocessor's running statistics
+        :rtype: dict of np.ndarray or jax.Array, or None
+        """
+        return None if preprocessor == self._empty_preprocessor else preprocessor.state_dict.params
+
+    def _values(self, states: Union[np.ndarray, jax.Array]) -> jax.Array:
+        """Compute the values (states preprocessing, value forward and inverse values preprocessing)
+
+        :param states: Environment's states
+        :type states: np.ndarray or jax.Array
+
+        :return: Values
+        :rtype: jax.Array
+        """
+        if self._compute_values is not None:
+            return self._compute_values(value_params=self.value.state_dict.params,
+                                        state_preprocessor_params=self._preprocessor_params(self._state_preprocessor),
+                                        value_preprocessor_params=self._preprocessor_params(self._value_preprocessor),
+                                        states=states)
+        values, _, _ = self.value.act({"states": self._state_preprocessor(states)}, role="value")
+        return self._value_preprocessor(values, inverse=True)
+
     def act(self, states: Union[np.ndarray, jax.Array], timestep: int, timesteps: int) -> Union[np.ndarray, jax.Array]:
         """Process the environment's states to make a decision (actions) using the main policy
 
@@ -355,11 +630,17 @@ class PPO(Agent):
 
         # sample stochastic actions
         actions, log_prob, outputs = self.policy.act({"states": self._state_preprocessor(states)}, role="policy")
-        if not self._jax:  # numpy backend
-            actions = jax.device_get(actions)
-            log_prob = jax.device_get(log_prob)
+
+        # compute values (to be recorded in memory along with the actions' log probabilities)
+        values = None
+        if self.memory is not None:
+            values = self._values(states)
+
+        if not self._jax:  # numpy backend (single device-to-host transfer)
+            actions, log_prob, values = jax.device_get((actions, log_prob, values))
 
         self._current_log_prob = log_prob
+        self._current_values = values
 
         return actions, log_prob, outputs
 
@@ -403,11 +684,13 @@ class PPO(Agent):
             if self._rewards_shaper is not None:
                 rewards = self._rewards_shaper(rewards, timestep, timesteps)
 
-            # compute values
-            values, _, _ = self.value.act({"states": self._state_preprocessor(states)}, role="value")
-            if not self._jax:  # numpy backend
-                values = jax.device_get(values)
-            values = self._value_preprocessor(values, inverse=True)
+            # compute values (if they were not computed when acting, e.g.: random actions)
+            values = self._current_values
+            if values is None:
+                values = self._values(states)
+                if not self._jax:  # numpy backend
+                    values = jax.device_get(values)
+            self._current_values = None
 
             # time-limit (truncation) boostrapping
             if self._time_limit_bootstrap:
@@ -457,13 +740,14 @@ class PPO(Agent):
         """
         # compute returns and advantages
         self.value.training = False
-        last_values, _, _ = self.value.act({"states": self._state_preprocessor(self._current_next_states)}, role="value")  # TODO: .float()
+        last_values = self._values(self._current_next_states)  # TODO: .float()
         self.value.training = True
         if not self._jax:  # numpy backend
             last_values = jax.device_get(last_values)
-        last_values = self._value_preprocessor(last_values, inverse=True)
 
         values = self.memory.get_tensor_by_name("values")
+        if self._bfloat16_storage:
+            values = values.astype(jnp.float32)
         if self._jax:
             returns, advantages = _compute_gae(rewards=self.memory.get_tensor_by_name("rewards"),
                                                dones=self.memory.get_tensor_by_name("terminated"),
@@ -480,77 +764,51 @@ class PPO(Agent):
                                               lambda_coefficient=self._lambda)
 
         self.memory.set_tensor_by_name("values", self._value_preprocessor(values, train=True))
-        self.memory.set_tensor_by_name("returns", self._value_preprocessor(returns, train=True))
+        # the computed returns are not used anymore, so their buffer is donated to the preprocessed output
+        # (the values are not donated since they can be the memory's own buffer)
+        if self._preprocessor_supports(self._value_preprocessor, "donate"):
+            self.memory.set_tensor_by_name("returns", self._value_preprocessor(returns, train=True, donate=True))
+        else:
+            self.memory.set_tensor_by_name("returns", self._value_preprocessor(returns, train=True))
         self.memory.set_tensor_by_name("advantages", advantages)
 
-        # sample mini-batches from memory
-        sampled_batches = self.memory.sample_all(names=self._tensors_names, mini_batches=self._mini_batches)
-
-        cumulative_policy_loss = 0
-        cumulative_entropy_loss = 0
-        cumulative_value_loss = 0
-
-        # learning epochs
-        for epoch in range(self._learning_epochs):
-            kl_divergences = []
-
-            # mini-batches loop
-            for sampled_states, sampled_actions, sampled_log_prob, sampled_values, sampled_returns, sampled_advantages in sampled_batches:
-
-                sampled_states = self._state_preprocessor(sampled_states, train=not epoch)
-
-                # compute policy loss
-                grad, policy_loss, entropy_loss, kl_divergence, stddev = _update_policy(self.policy.act,
-                                                                                        self.policy.state_dict,
-                                                                                        sampled_states,
-                                                                                        sampled_actions,
-                                                                                        sampled_log_prob,
-                                                                                        sampled_advantages,
-                                                                                        self._ratio_clip,
-                                                                                        self.policy.get_entropy,
-                                                                                        self._entropy_loss_scale)
-
-                kl_divergences.append(kl_divergence.item())
-
-                # early stopping with KL divergence
-                if self._kl_threshold and kl_divergence > self._kl_threshold:
-                    break
-
-                # optimization step (policy)
-                if config.jax.is_distributed:
-                    grad = self.policy.reduce_parameters(grad)
-                self.policy_optimizer = self.policy_optimizer.step(grad, self.policy, self.scheduler._lr if self.scheduler else None)
-
-                # compute value loss
-                grad, value_loss = _update_value(self.value.act,
-                                                 self.value.state_dict,
-                                                 sampled_states,
-                                                 sampled_values,
-                                                 sampled_returns,
-                                                 self._value_loss_scale,
-                                                 self._clip_predicted_values,
-                                                 self._value_clip)
-
-                # optimization step (value)
-                if config.jax.is_distributed:
-                    grad = self.value.reduce_parameters(grad)
-                self.value_optimizer = self.value_optimizer.step(grad, self.value, self.scheduler._lr if self.scheduler else None)
-
-                # update cumulative losses
-                cumulative_policy_loss += policy_loss.item()
-                cumulative_value_loss += value_loss.item()
-                if self._entropy_loss_scale:
-                    cumulative_entropy_loss += entropy_loss.item()
-
-            # update learning rate
-            if self._learning_rate_scheduler:
-                if isinstance(self.scheduler, KLAdaptiveLR):
-                    kl = np.mean(kl_divergences)
-                    # reduce (collect from all workers/processes) KL in distributed runs
-                    if config.jax.is_distributed:
-                        kl = jax.pmap(lambda x: jax.lax.psum(x, 'i'), axis_name='i')(kl.reshape(1)).item()
-                        kl /= config.jax.world_size
-                    self.scheduler.step(kl)
+        # mini-batches indexes (the same sequential split of the memory, as sample_all, for each learning epoch)
+        memory_size = self.memory.memory_size * self.memory.num_envs
+        batch_size = memory_size // self._mini_batches
+        indexes = np.stack([np.arange(memory_size)[:self._mini_batches * batch_size] \
+            .reshape(self._mini_batches, batch_size) for _ in range(self._learning_epochs)])
+        sampled_tensors = [self.memory.get_tensor_by_name(name, keepdim=False) for name in self._tensors_names]
+
+        # preprocess the whole states memory once (training the state preprocessor) and reuse it for all mini-batches
+        sampled_tensors[0] = self._state_preprocessor(sampled_tensors[0], train=True)
+
+        # learning epochs and mini-batches loops (the models and optimizers buffers are donated)
+        args = (self.policy.state_dict,
+                self.value.state_dict,
+                self.policy_optimizer,
+                self.value_optimizer,
+                self.scheduler._lr if self.scheduler else None,
+                sampled_tensors,
+                indexes,
+                self._ratio_clip,
+                self._value_loss_scale,
+                self._value_clip)
+        if config.jax.is_distributed:
+            args = jax.tree_util.tree_map(lambda x: jnp.expand_dims(x, 0), args)
+        outputs = self._update_epochs(*args)
+        if config.jax.is_distributed:
+            outputs = jax.tree_util.tree_map(lambda x: x[0], outputs)
+        self.policy.state_dict, self.value.state_dict, self.policy_optimizer, self.value_optimizer, \
+            learning_rate, losses, stddev = outputs
+        # the previous optimizers' buffers were donated, so checkpoint the new instances
+        self.checkpoint_modules["policy_optimizer"] = self.policy_optimizer
+        self.checkpoint_modules["value_optimizer"] = self.value_optimizer
+
+        # synchronize (single device-to-host transfer)
+        learning_rate, losses, stddev = jax.device_get((learning_rate, losses, stddev))
+        if self.scheduler:
+            self.scheduler._lr = learning_rate.item()
+        cumulative_policy_loss, cumulative_value_loss, cumulative_entropy_loss = losses.tolist()
 
         # record data
         self.track_data("Loss / Policy loss", cumulative_policy_loss / (self._learning_epochs * self._mini_batches))
@@ -558,7 +816,7 @@ class PPO(Agent):
         if self._entropy_loss_scale:
             self.track_data("Loss / Entropy loss", cumulative_entropy_loss / (self._learning_epochs * self._mini_batches))
 
-        self.track_data("Policy / Standard deviation", stddev.mean().item())
+        self.track_data("Policy / Standard deviation", stddev.item())
 
         if self._learning_rate_scheduler:
             self.track_data("Learning / Learning rate", self.scheduler._lr)
@@ -20,15 +20,15 @@ from skrl import config
 def _copyto(dst, src):
     """NumPy function <function copyto at 0x7f804ee03430> not yet implemented
     """
-    return dst.at[:].set(src)
+    return dst.at[:].set(jnp.asarray(src, dtype=dst.dtype))
 
-@jax.jit
-def _copyto_i(dst, src, i):
-    return dst.at[i].set(src)
+@functools.partial(jax.jit, donate_argnums=0)
+def _copyto_index(dsts, srcs, index):
+    """Copy the samples of all tensors at the given (memory, environment) index in a single call
 
-@jax.jit
-def _copyto_i_j(dst, src, i, j):
-    return dst.at[i, j].set(src)
+    The memory buffers are donated so that the samples can be written in-place
+    """
+    return {name: dst.at[index].set(jnp.asarray(srcs[name], dtype=dst.dtype)) for name, dst in dsts.items()}
 
 
 class Memory:
@@ -172,6 +172,12 @@ class Memory:
     def get_tensor_by_name(self, name: str, keepdim: bool = True) -> Union[np.ndarray, jax.Array]:
         """Get a tensor by its name
 
+        .. warning::
+
+            With the JAX backend, the memory tensors' buffers are donated when recording samples (``.add_samples()``).
+            A tensor returned with ``keepdim=True`` is the memory's own array: it is invalidated (deleted)
+            by the next call to ``.add_samples()``. Copy it (e.g. ``jnp.array(tensor)``) to keep a snapshot
+
         :param name: Name of the tensor to retrieve
         :type name: str
         :param keepdim: Keep the tensor's shape (memory size, number of environments, size) (default: ``True``)
@@ -252,7 +258,7 @@ class Memory:
         self.tensors_keep_dimensions[name] = size if keep_dimensions else None
         # fill the tensors (float tensors) with NaN
         for name, tensor in self.tensors.items():
-            if tensor.dtype == np.float32 or tensor.dtype == np.float64:
+            if tensor.dtype == np.float32 or tensor.dtype == np.float64 or tensor.dtype == jnp.bfloat16:
                 if self._jax:
                     with jax.default_device(self.device):
                         self.tensors[name] = _copyto(self.tensors[name], float("nan"))
@@ -297,6 +303,10 @@ class Memory:
         - number of environments equals num_envs:
           Store the samples and increment the memory index (first index) by one
 
+        With the JAX backend, the samples of all tensors are written in-place in a single JIT-compiled call
+        that donates the memory tensors' buffers. Arrays previously returned by ``.get_tensor_by_name(keepdim=True)``
+        are invalidated (deleted) by this call
+
         :param tensors: Sampled data as key-value arguments where the keys are the names of the tensors to be modified.
                         Non-existing tensors will be skipped
         :type tensors: dict
@@ -313,9 +323,10 @@ class Memory:
         # multi environment (number of environments equals num_envs)
         if dim > 1 and shape[0] == self.num_envs:
             if self._jax:
-                for name, tensor in tensors.items():
-                    if name in self.tensors:
-                        self.tensors[name] = _copyto_i(self.tensors[name], tensor, self.memory_index)
+                names = [name for name in tensors if name in self.tensors]
+                self.tensors.update(_copyto_index({name: self.tensors[name] for name in names},
+                                                  {name: tensors[name] for name in names},
+                                                  self.memory_index))
             else:
                 for name, tensor in tensors.items():
                     if name in self.tensors:
@@ -345,9 +356,10 @@ class Memory:
         # single environment
         elif dim == 1:
             if self._jax:
-                for name, tensor in tensors.items():
-                    if name in self.tensors:
-                        self.tensors[name] = _copyto_i_j(self.tensors[name], tensor, self.memory_index, self.env_index)
+                names = [name for name in tensors if name in self.tensors]
+                self.tensors.update(_copyto_index({name: self.tensors[name] for name in names},
+                                                  {name: tensors[name] for name in names},
+                                                  (self.memory_index, self.env_index)))
             else:
                 for name, tensor in tensors.items():
                     if name in self.tensors:
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 import functools
 
@@ -7,6 +7,7 @@ import jax
 import optax
 
 from skrl.models.jax import Model
+from skrl.models.jax.base import StateDict
 
 
 # https://jax.readthedocs.io/en/latest/faq.html#strategy-1-jit-compiled-helper-function
@@ -92,11 +93,31 @@ class Adam:
                 :return: Optimizer
                 :rtype: flax.struct.PyTreeNode
                 """
+                optimizer, model.state_dict = self.apply_gradients(grad, model.state_dict, lr)
+                return optimizer
+
+            def apply_gradients(self, grad: jax.Array, state_dict: StateDict, lr: Optional[float] = None) -> Tuple["Optimizer", StateDict]:
+                """Performs a single optimization step on a model's state dict
+
+                Unlike ``.step()``, no model is modified: the updated state dict is returned instead.
+                This allows threading the optimizer and the model parameters through JIT-compiled functions
+
+                :param grad: Gradients
+                :type grad: jax.Array
+                :param state_dict: Model's state dict
+                :type state_dict: skrl.models.jax.base.StateDict
+                :param lr: Learning rate.
+                           If given, a scale optimization step will be performed
+                :type lr: float, optional
+
+                :return: Optimizer and updated model's state dict
+                :rtype: tuple of flax.struct.PyTreeNode and skrl.models.jax.base.StateDict
+                """
                 if lr is None:
-                    optimizer_state, model.state_dict = _step(self.transformation, grad, self.state, model.state_dict)
+                    optimizer_state, state_dict = _step(self.transformation, grad, self.state, state_dict)
                 else:
-                    optimizer_state, model.state_dict = _step_with_scale(self.transformation, grad, self.state, model.state_dict, -lr)
-                return self.replace(state=optimizer_state)
+                    optimizer_state, state_dict = _step_with_scale(self.transformation, grad, self.state, state_dict, -lr)
+                return self.replace(state=optimizer_state), state_dict
 
         # default optax transformation
         if scale:
@@ -1,5 +1,6 @@
 from typing import Mapping, Optional, Tuple, Union
 
+import functools
 import gym
 import gymnasium
 
@@ -58,6 +59,16 @@ def _standardization(running_mean: jax.Array,
     return jnp.clip((array - running_mean) / (jnp.sqrt(running_variance) + epsilon), -clip_threshold, clip_threshold)
 
 
+@functools.partial(jax.jit, donate_argnums=4)
+def _standardization_donated(running_mean: jax.Array,
+                             running_variance: jax.Array,
+                             clip_threshold: float,
+                             epsilon: float,
+                             array: jax.Array) -> jax.Array:
+    # the input array's buffer is donated (reused for the output)
+    return _standardization(running_mean, running_variance, clip_threshold, epsilon, array)
+
+
 class RunningStandardScaler:
     def __init__(self,
                  size: Union[int, Tuple[int], gym.Space, gymnasium.Space],
@@ -199,7 +210,9 @@ class RunningStandardScaler:
     def __call__(self,
                  x: Union[np.ndarray, jax.Array],
                  train: bool = False,
-                 inverse: bool = False) -> Union[np.ndarray, jax.Array]:
+                 inverse: bool = False,
+                 params: Optional[Mapping[str, Union[np.ndarray, jax.Array]]] = None,
+                 donate: bool = False) -> Union[np.ndarray, jax.Array]:
         """Forward pass of the standardizer
 
         Example::
@@ -226,10 +239,24 @@ class RunningStandardScaler:
         :type train: bool, optional
         :param inverse: Whether to inverse the standardizer to scale back the data (default: ``False``)
         :type inverse: bool, optional
+        :param params: Running statistics used to compute the output (default: ``None``).
+                       If ``None``, internal statistics will be used. Otherwise, the data is processed
+                       with JAX (e.g. to be traced inside a jitted function) and the standardizer is not trained
+        :type params: dict of np.ndarray or jax.Array, optional
+        :param donate: Whether to donate the input array's buffer to the standardized output (default: ``False``).
+                       The input array must not be used after the call. It only applies to the JAX backend
+        :type donate: bool, optional
 
         :return: Standardized tensor
         :rtype: np.ndarray or jax.Array
         """
+        # use the given running statistics (e.g.: state_dict.params)
+        if params is not None:
+            if inverse:
+                return _inverse(params["running_mean"], params["running_variance"], self.clip_threshold, x)
+            return _standardization(params["running_mean"], params["running_variance"], self.clip_threshold,
+                                    self.epsilon, x)
+
         if train:
             if self._jax:
                 self.running_mean, self.running_variance, self.current_count = \
@@ -251,6 +278,9 @@ class RunningStandardScaler:
                                                             self.clip_threshold) + self.running_mean
         # standardization by centering and scaling
         if self._jax:
+            if donate:
+                return _standardization_donated(self.running_mean, self.running_variance, self.clip_threshold,
+                                                self.epsilon, x)
             return _standardization(self.running_mean, self.running_variance, self.clip_threshold, self.epsilon, x)
         return np.clip((x - self.running_mean) / (np.sqrt(self.running_variance) + self.epsilon),
                        a_min=-self.clip_threshold,
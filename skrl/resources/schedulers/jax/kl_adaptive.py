@@ -1,5 +1,7 @@
 from typing import Optional, Union
 
+import jax
+import jax.numpy as jnp
 import numpy as np
 
 
@@ -83,6 +85,30 @@ class KLAdaptiveLR:
             elif kl < self.kl_threshold / self._kl_factor:
                 self._lr = min(self._lr * self._lr_factor, self.max_lr)
 
+    def compute_lr(self, lr: Union[float, jax.Array], kl: Union[float, jax.Array]) -> jax.Array:
+        """Compute the learning rate adjusted according to the KL divergence without stepping the scheduler
+
+        Unlike ``.step()``, this method is implemented with array operations only,
+        so it can be used inside JIT-compiled functions
+
+        Example::
+
+            >>> lr = scheduler.compute_lr(scheduler.lr, 0.0046)
+
+        :param lr: Current learning rate
+        :type lr: float or jax.Array
+        :param kl: KL divergence
+        :type kl: float or jax.Array
+
+        :return: Adjusted learning rate
+        :rtype: jax.Array
+        """
+        return jnp.where(kl > self.kl_threshold * self._kl_factor,
+                         jnp.maximum(lr / self._lr_factor, self.min_lr),
+                         jnp.where(kl < self.kl_threshold / self._kl_factor,
+                                   jnp.minimum(lr * self._lr_factor, self.max_lr),
+                                   lr))
+
 
 # Alias to maintain naming compatibility with Optax schedulers
 # https://optax.readthedocs.io/en/latest/api.html#schedules
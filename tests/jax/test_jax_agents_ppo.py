@@ -0,0 +1,49 @@
+import pytest
+
+import jax.numpy as jnp
+import numpy as np
+
+from skrl.agents.jax.ppo import ppo
+
+
+@pytest.mark.parametrize("next_values", ["array", "scalar", "broadcast", "float64"])
+def test_compute_gae_numba(capsys, monkeypatch, next_values):
+    pytest.importorskip("numba")
+
+    rng = np.random.default_rng(0)
+    rewards = rng.standard_normal((16, 5, 1)).astype(np.float32)
+    dones = rng.random((16, 5, 1)) < 0.1
+    values = rng.standard_normal((16, 5, 1)).astype(np.float32)
+    next_values = {"array": rng.standard_normal((5, 1)).astype(np.float32),
+                   "scalar": 5.0,
+                   "broadcast": np.full((1, 1), 5.0, dtype=np.float32),
+                   "float64": rng.standard_normal((5, 1))}[next_values]
+
+    returns, advantages = ppo.compute_gae(rewards, dones, values, next_values, 0.99, 0.95)
+    # NumPy implementation (fallback)
+    monkeypatch.setattr(ppo, "numba", None)
+    expected_returns, expected_advantages = ppo.compute_gae(rewards, dones, values, next_values, 0.99, 0.95)
+
+    assert returns.shape == expected_returns.shape and returns.dtype == expected_returns.dtype
+    assert advantages.shape == expected_advantages.shape and advantages.dtype == expected_advantages.dtype
+    assert np.allclose(returns, expected_returns, atol=1e-5)
+    assert np.allclose(advantages, expected_advantages, atol=1e-5)
+
+
+@pytest.mark.parametrize("memory_size", [1, 16, 64, 65, 300])  # partially unrolled (<= 64) and not unrolled scan
+def test_compute_gae_jax(capsys, monkeypatch, memory_size):
+    rng = np.random.default_rng(0)
+    rewards = rng.standard_normal((memory_size, 5, 1)).astype(np.float32)
+    dones = (rng.random((memory_size, 5, 1)) < 0.1).astype(np.int8)
+    values = rng.standard_normal((memory_size, 5, 1)).astype(np.float32)
+    next_values = rng.standard_normal((5, 1)).astype(np.float32)
+
+    returns, advantages = ppo._compute_gae(jnp.asarray(rewards), jnp.asarray(dones), jnp.asarray(values),
+                                           jnp.asarray(next_values), 0.99, 0.95)
+    # NumPy implementation (fallback)
+    monkeypatch.setattr(ppo, "numba", None)
+    expected_returns, expected_advantages = ppo.compute_gae(rewards, dones, values, next_values, 0.99, 0.95)
+
+    assert returns.shape == expected_returns.shape and advantages.shape == expected_advantages.shape
+    assert np.allclose(returns, expected_returns, atol=1e-4)
+    assert np.allclose(advantages, expected_advantages, atol=1e-4)
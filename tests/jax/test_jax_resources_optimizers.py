@@ -0,0 +1,53 @@
+import pytest
+
+import gymnasium as gym
+
+import flax.linen as nn
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+from skrl.models.jax import DeterministicMixin, Model
+from skrl.resources.optimizers.jax import Adam
+
+
+class _Model(DeterministicMixin, Model):
+    def __init__(self, observation_space, action_space, device=None, **kwargs):
+        Model.__init__(self, observation_space, action_space, device, **kwargs)
+        DeterministicMixin.__init__(self, False)
+
+    @nn.compact
+    def __call__(self, inputs, role):
+        return nn.Dense(self.num_actions)(inputs["states"]), {}
+
+
+def _model():
+    model = _Model(gym.spaces.Box(-1, 1, (3,)), gym.spaces.Box(-1, 1, (2,)), device="cpu")
+    model.init_state_dict("model")
+    return model
+
+
+@pytest.mark.parametrize("lr", [None, 1e-2])
+@pytest.mark.parametrize("grad_norm_clip", [0, 0.5])
+def test_apply_gradients(capsys, lr, grad_norm_clip):
+    model = _model()
+    states = jnp.ones((4, 3))
+
+    def _loss(params):
+        return jnp.square(model.apply(params, {"states": states}, "model")[0]).mean()
+
+    optimizer = Adam(model=model, lr=1e-3, grad_norm_clip=grad_norm_clip, scale=lr is None)
+    state_dict = model.state_dict
+    for _ in range(3):
+        grad = jax.grad(_loss)(model.state_dict.params)
+        # functional step (the model is not modified)
+        functional_optimizer, state_dict = optimizer.apply_gradients(grad, model.state_dict, lr)
+        # in-place step
+        optimizer = optimizer.step(grad, model, lr)
+
+        for param, expected in zip(jax.tree_util.tree_leaves(state_dict.params),
+                                   jax.tree_util.tree_leaves(model.state_dict.params)):
+            assert np.allclose(param, expected)
+        for state, expected in zip(jax.tree_util.tree_leaves(functional_optimizer.state),
+                                   jax.tree_util.tree_leaves(optimizer.state)):
+            assert np.allclose(state, expected)
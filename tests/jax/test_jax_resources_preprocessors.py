@@ -0,0 +1,44 @@
+import pytest
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+from skrl import config
+from skrl.resources.preprocessors.jax import RunningStandardScaler
+
+
+@pytest.fixture
+def preprocessor():
+    config.jax.backend = "jax"
+    preprocessor = RunningStandardScaler(size=3, device="cpu")
+    preprocessor(jax.random.normal(jax.random.PRNGKey(0), (10, 3)) * 2 + 1, train=True)
+    return preprocessor
+
+
+@pytest.mark.parametrize("inverse", [False, True])
+def test_params(capsys, preprocessor, inverse):
+    x = jax.random.normal(jax.random.PRNGKey(1), (5, 3))
+    expected = preprocessor(x, inverse=inverse)
+    # given statistics
+    output = preprocessor(x, inverse=inverse, params=preprocessor.state_dict.params)
+    assert np.allclose(output, expected)
+    # given statistics inside a JIT-compiled function (the statistics are not frozen at trace time)
+    _call = jax.jit(lambda params, x: preprocessor(x, inverse=inverse, params=params))
+    assert np.allclose(_call(preprocessor.state_dict.params, x), expected)
+    preprocessor(x * 3, train=True)
+    assert np.allclose(_call(preprocessor.state_dict.params, x), preprocessor(x, inverse=inverse))
+
+
+@pytest.mark.parametrize("train", [False, True])
+def test_donate(capsys, preprocessor, train):
+    x = jax.random.normal(jax.random.PRNGKey(1), (5, 3))
+    donated = jnp.array(x)
+    if train:
+        output = preprocessor(donated, train=True, donate=True)
+        expected = preprocessor(x)  # non-donated output with the updated statistics
+    else:
+        expected = preprocessor(x)
+        output = preprocessor(donated, donate=True)
+    assert np.allclose(output, expected)
+    assert donated.is_deleted()
@@ -0,0 +1,21 @@
+import pytest
+
+import jax
+import numpy as np
+
+from skrl.resources.schedulers.jax import KLAdaptiveLR
+
+
+@pytest.mark.parametrize("kl", [0.1, 0.001, 0.008])  # decrease, increase and keep the learning rate
+@pytest.mark.parametrize("init_value", [1e-3, 1e-6, 1e-2])  # lower and upper bounds
+def test_compute_lr(capsys, kl, init_value):
+    scheduler = KLAdaptiveLR(init_value, kl_threshold=0.008)
+
+    lr = scheduler.compute_lr(scheduler.lr, kl)
+    scheduler.step(kl)
+    assert np.isclose(lr, scheduler.lr)
+
+    # inside a JIT-compiled function
+    lr = jax.jit(scheduler.compute_lr)(scheduler.lr, kl)
+    scheduler.step(kl)
+    assert np.isclose(lr, scheduler.lr)
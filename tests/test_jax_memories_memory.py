@@ -6,12 +6,15 @@ import jax
 import jax.numpy as jnp
 import numpy as np
 
+from skrl import config
 from skrl.memories.jax import Memory
 
 
 class TestCase(unittest.TestCase):
     def setUp(self):
-        self.devices = [jax.devices("cpu")[0], jax.devices("gpu")[0]]
+        self.devices = [jax.devices("cpu")[0]]
+        if jax.default_backend() == "gpu":
+            self.devices.append(jax.devices("gpu")[0])
 
         self.memory_sizes = [10, 100, 1000]
         self.num_envs = [1, 10, 100]
@@ -80,6 +83,88 @@ class TestCase(unittest.TestCase):
                     self.assertTrue((sample.reshape(memory_size, num_envs, size) == tensor).all().item(), f"sample_all(...) with mini_batches={mini_batches}")
 
 
+    def test_add_samples(self):
+        config.jax.backend = "jax"
+        device = jax.devices("cpu")[0]
+        for memory_size, num_envs in zip(self.memory_sizes, self.num_envs):
+            # create memory
+            memory = Memory(memory_size=memory_size, num_envs=num_envs, device=device)
+
+            # create tensors
+            for name, size, dtype in zip(self.names, self.raw_sizes, self.raw_dtypes):
+                memory.create_tensor(name, size, dtype)
+
+            # test memory.add_samples (multi environment)
+            for i in range(memory_size):
+                memory.add_samples(**{name: jnp.full((num_envs, size), i).astype(dtype) \
+                                      for name, size, dtype in zip(self.names, self.sizes, self.raw_dtypes)})
+                self.assertEqual(memory.memory_index, (i + 1) % memory_size, "add_samples(...).memory_index")
+            self.assertTrue(memory.filled, "add_samples(...).filled")
+            for name, size, dtype in zip(self.names, self.sizes, self.raw_dtypes):
+                expected = jnp.broadcast_to(jnp.arange(memory_size).reshape(-1, 1, 1), (memory_size, num_envs, size)).astype(dtype)
+                tensor = memory.get_tensor_by_name(name, keepdim=True)
+                self.assertTrue((tensor == expected).all().item(), "add_samples(...)")
+
+            # test memory.add_samples (single environment)
+            memory.reset()
+            for j in range(num_envs):
+                memory.add_samples(**{name: jnp.full((size,), -j).astype(dtype) \
+                                      for name, size, dtype in zip(self.names, self.sizes, self.raw_dtypes)})
+                self.assertEqual(memory.env_index, (j + 1) % num_envs, "add_samples(...).env_index")
+            self.assertEqual(memory.memory_index, 1 % memory_size, "add_samples(...).memory_index")
+            for name, size, dtype in zip(self.names, self.sizes, self.raw_dtypes):
+                expected = jnp.broadcast_to(-jnp.arange(num_envs).reshape(-1, 1), (num_envs, size)).astype(dtype)
+                tensor = memory.get_tensor_by_name(name, keepdim=True)
+                self.assertTrue((tensor[0] == expected).all().item(), "add_samples(...) (single environment)")
+                self.assertTrue((tensor[1:] == jnp.arange(1, memory_size).reshape(-1, 1, 1).astype(dtype)).all().item(),
+                                "add_samples(...) (single environment) out of the memory index")
+
+    def test_add_samples_dtype(self):
+        config.jax.backend = "jax"
+        device = jax.devices("cpu")[0]
+        memory = Memory(memory_size=10, num_envs=4, device=device)
+        memory.create_tensor("states", 3, jnp.bfloat16)
+
+        # float tensors (including bfloat16) are filled with NaN
+        tensor = memory.get_tensor_by_name("states", keepdim=True)
+        self.assertEqual(tensor.dtype, jnp.bfloat16, "create_tensor(...).dtype")
+        self.assertTrue(jnp.isnan(tensor).all().item(), "create_tensor(...) NaN fill")
+
+        # float32 samples are cast to the tensor's dtype
+        samples = jax.random.normal(jax.random.PRNGKey(0), (4, 3), dtype=jnp.float32)
+        memory.add_samples(states=samples)
+        tensor = memory.get_tensor_by_name("states", keepdim=True)
+        self.assertEqual(tensor.dtype, jnp.bfloat16, "add_samples(...).dtype")
+        self.assertTrue((tensor[0] == samples.astype(jnp.bfloat16)).all().item(), "add_samples(...) casting")
+        self.assertTrue(jnp.isnan(tensor[1:]).all().item(), "add_samples(...) NaN fill")
+
+        # single environment
+        memory.add_samples(states=samples[0])
+        tensor = memory.get_tensor_by_name("states", keepdim=True)
+        self.assertEqual(tensor.dtype, jnp.bfloat16, "add_samples(...).dtype (single environment)")
+        self.assertTrue((tensor[1, 0] == samples[0].astype(jnp.bfloat16)).all().item(), "add_samples(...) casting (single environment)")
+
+    def test_add_samples_donation(self):
+        config.jax.backend = "jax"
+        device = jax.devices("cpu")[0]
+        memory = Memory(memory_size=10, num_envs=4, device=device)
+        for name, size, dtype in zip(self.names, self.raw_sizes, self.raw_dtypes):
+            memory.create_tensor(name, size, dtype)
+
+        # tensors returned with keepdim=True are invalidated by the next call to add_samples
+        tensors = {name: memory.get_tensor_by_name(name, keepdim=True) for name in self.names}
+        snapshot = jnp.array(tensors["states"])
+        memory.add_samples(**{name: jnp.ones((4, size)).astype(dtype) \
+                              for name, size, dtype in zip(self.names, self.sizes, self.raw_dtypes)})
+        for name in self.names:
+            self.assertTrue(tensors[name].is_deleted(), "get_tensor_by_name(..., keepdim=True) after add_samples(...)")
+            with self.assertRaises(RuntimeError):
+                tensors[name] + 1
+            self.assertFalse(memory.get_tensor_by_name(name, keepdim=True).is_deleted(), "get_tensor_by_name(...)")
+        # copies are not affected
+        self.assertFalse(snapshot.is_deleted(), "copy of get_tensor_by_name(...)")
+        self.assertTrue(jnp.isnan(snapshot).all().item(), "copy of get_tensor_by_name(...)")
+
 if __name__ == '__main__':
     import sys
 